@@ -9,6 +9,10 @@ MODEL_PATH = OUTPUT_DIR / "tennis_model.pkl"
 ACCURACY_PLOT = OUTPUT_DIR / "accuracy_comparison.png"
 FEATURE_IMPORTANCE_PLOT = OUTPUT_DIR / "feature_importance.png"
 
+# Bump whenever preprocessing/feature code changes output,
+# so features cached by earlier runs are not reused.
+FEATURE_VERSION = 2
+
 # ==========================================
 # MODEL PARAMETERS
 # ==========================================
@@ -18,6 +22,10 @@ DEFAULT_RANK = 2000
 DEFAULT_WIN_PCT = 0.5
 VALID_SURFACES = {"Hard", "Clay", "Grass"}
 
+# Every surface code used in feature engineering (fixed order = surface_id).
+# Missing or unrecognised surfaces are coded as "Unknown".
+SURFACES = ["Hard", "Clay", "Grass", "Carpet", "Unknown"]
+
 # Recent Form Windows (N matches)
 RECENT_FORM_WINDOWS = [5, 10]
 
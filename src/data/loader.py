@@ -2,6 +2,9 @@
 Data loading utilities for ATP tennis match data.
 Handles downloading from GitHub and local caching.
 """
+import config
+import hashlib
+import pickle
 import pandas as pd
 from pathlib import Path
 
@@ -73,8 +76,8 @@ def load_cached_data(
         return None
 
     print(f"📂 Loading cached data from {path}...")
-    df = pd.read_csv(path)
-    df['tourney_date'] = pd.to_datetime(df['tourney_date'], format="%Y%m%d", errors="coerce")
+    # Arrow's multithreaded CSV parser; columns still come back as regular pandas dtypes
+    df = pd.read_csv(path, engine="pyarrow")
 
     cached_min = df['year'].min()
     cached_max = df['year'].max()
@@ -83,4 +86,48 @@ def load_cached_data(
         print(f"⚠️  Cache outdated (Have {cached_min}-{cached_max}, need {start_year}-{end_year})")
         return None
 
-    return df
\ No newline at end of file
+    return df
+
+def feature_cache_paths(data_path: Path, start_year: int, end_year: int) -> tuple[Path, Path]:
+    """
+    Paths for the cached feature table (Parquet) and history dicts (pickle).
+    Keyed by the raw data file's mtime, the year range and FEATURE_VERSION.
+    """
+    key = f"{data_path.stat().st_mtime}-{start_year}-{end_year}-{config.FEATURE_VERSION}"
+    cache_key = hashlib.md5(key.encode()).hexdigest()
+
+    features_path = config.OUTPUT_DIR / f"features_{cache_key}.parquet"
+    history_path = config.OUTPUT_DIR / f"history_{cache_key}.pkl"
+    return features_path, history_path
+
+def load_cached_features(features_path: Path, history_path: Path) -> tuple[pd.DataFrame, dict, dict] | None:
+    """
+    Load engineered features and history dicts saved by a previous run.
+    Returns None if either cache file is missing.
+    """
+    if not features_path.exists() or not history_path.exists():
+        return None
+
+    print(f"📂 Loading cached features from {features_path}...")
+    df = pd.read_parquet(features_path)
+    with open(history_path, "rb") as f:
+        surface_history, h2h_history = pickle.load(f)
+
+    return df, surface_history, h2h_history
+
+def save_cached_features(
+    features_path: Path,
+    history_path: Path,
+    df: pd.DataFrame,
+    surface_history: dict,
+    h2h_history: dict
+) -> None:
+    """
+    Save engineered features and history dicts for reuse by later runs.
+    """
+    features_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(features_path, index=False)
+    with open(history_path, "wb") as f:
+        pickle.dump((surface_history, h2h_history), f)
+
+    print(f"💾 Features cached to {features_path}")
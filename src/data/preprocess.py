@@ -6,6 +6,11 @@ import config
 import pandas as pd
 import numpy as np
 
+# Bytes that str.split() treats as whitespace, and markers that void a
+# set token, matching parse_match_score.
+SCORE_WHITESPACE = np.frombuffer(b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f", dtype=np.uint8)
+SCORE_SKIP_MARKERS = (b"RET", b"W/O", b"def.")
+
 def preprocess_data(df: pd.DataFrame, odds_df: pd.DataFrame = None) -> pd.DataFrame:
     """
     Preprocess raw ATP match data by:
@@ -13,15 +18,20 @@ def preprocess_data(df: pd.DataFrame, odds_df: pd.DataFrame = None) -> pd.DataFr
     - Randomizing player order to create a balanced dataset
     - Creating a binary target (1 = P1 win, 0 = P1 loss)
     - Parsing score strings into game/set statistics
+    - Encoding players and surfaces as integer ids
     """
-    df = df.copy()
-
     # Handle missing values
-    df["winner_rank"] = df["winner_rank"].fillna(config.DEFAULT_RANK)
-    df["loser_rank"]  = df["loser_rank"].fillna(config.DEFAULT_RANK)
+    # assign() returns a new frame, so the caller's df is never mutated.
+    # Age medians are per column, computed in one call.
+    age_cols = ["winner_age", "loser_age"]
+    ages = df[age_cols].fillna(df[age_cols].median())
 
-    df["winner_age"] = df["winner_age"].fillna(df["winner_age"].median())
-    df["loser_age"]  = df["loser_age"].fillna(df["loser_age"].median())
+    df = df.assign(
+        winner_rank=df["winner_rank"].fillna(config.DEFAULT_RANK),
+        loser_rank=df["loser_rank"].fillna(config.DEFAULT_RANK),
+        winner_age=ages["winner_age"],
+        loser_age=ages["loser_age"],
+    )
 
     # ----------------------------------------------------
     # Merge Odds Data
@@ -29,10 +39,9 @@ def preprocess_data(df: pd.DataFrame, odds_df: pd.DataFrame = None) -> pd.DataFr
     if odds_df is not None and not odds_df.empty:
         odds_df = odds_df.copy()
         
-        # Sackmann date is YYYYMMDD
-        df_dates = pd.to_datetime(df["tourney_date"], format="%Y%m%d", errors="coerce")
-        df["_year"] = df_dates.dt.year
-        df["_month"] = df_dates.dt.month
+        # Sackmann date is a YYYYMMDD int
+        df["_year"] = df["tourney_date"] // 10000
+        df["_month"] = df["tourney_date"] // 100 % 100
         
         # Last name extraction: "Grigor Dimitrov" -> "Dimitrov"
         df["_w_last"] = df["winner_name"].str.split().str[-1]
@@ -97,7 +106,7 @@ def preprocess_data(df: pd.DataFrame, odds_df: pd.DataFrame = None) -> pd.DataFr
     new_df = pd.DataFrame({
         "tourney_date": df["tourney_date"],
         "surface": df["surface"],
-        "tourney_level": df["tourney_level"],
+        "tourney_level": df["tourney_level"].astype("category"),
 
         "p1_name": np.where(swap_players, df["loser_name"], df["winner_name"]),
         "p1_rank": np.where(swap_players, df["loser_rank"], df["winner_rank"]),
@@ -120,42 +129,151 @@ def preprocess_data(df: pd.DataFrame, odds_df: pd.DataFrame = None) -> pd.DataFr
     # then swap if p1 is actually the loser.
     
     # 1. Parse score for the official winner/loser
-    scores = df["score"].fillna("")
-    w_games_won, w_games_lost = [], []
-    w_sets_won, w_sets_lost = [], []
-
-    for score in scores:
-        gw, gl, sw, sl = parse_match_score(score)
-        w_games_won.append(gw)
-        w_games_lost.append(gl)
-        w_sets_won.append(sw)
-        w_sets_lost.append(sl)
+    w_games_won, w_games_lost, w_sets_won, w_sets_lost = parse_match_scores(df["score"])
 
     # 2. Assign to p1 / p2 based on swap_players
     # If swap_players is True: P1 is Loser, P2 is Winner
     # If swap_players is False: P1 is Winner, P2 is Loser
     
-    p1_games_won = np.where(swap_players, w_games_lost, w_games_won)
-    p1_games_lost = np.where(swap_players, w_games_won, w_games_lost)
-    p1_sets_won  = np.where(swap_players, w_sets_lost, w_sets_won)
-    p1_sets_lost = np.where(swap_players, w_sets_won, w_sets_lost)
-
-    p2_games_won = np.where(swap_players, w_games_won, w_games_lost)
-    p2_games_lost = np.where(swap_players, w_games_lost, w_games_won)
-    p2_sets_won  = np.where(swap_players, w_sets_won, w_sets_lost)
-    p2_sets_lost = np.where(swap_players, w_sets_lost, w_sets_won)
-    
-    new_df["p1_games_won"] = p1_games_won
-    new_df["p1_games_lost"] = p1_games_lost
-    new_df["p1_sets_won"] = p1_sets_won
-    new_df["p1_sets_lost"] = p1_sets_lost
-    
-    new_df["p2_games_won"] = p2_games_won
-    new_df["p2_games_lost"] = p2_games_lost
-    new_df["p2_sets_won"] = p2_sets_won
-    new_df["p2_sets_lost"] = p2_sets_lost
+    # Swapping is a column permutation, so select the whole 4-column block
+    # with one mask read.
+    w_block = np.column_stack([w_games_won, w_games_lost, w_sets_won, w_sets_lost])
+    l_block = np.column_stack([w_games_lost, w_games_won, w_sets_lost, w_sets_won])
+
+    p1_block = np.where(swap_players[:, None], l_block, w_block)
+    new_df[["p1_games_won", "p1_games_lost", "p1_sets_won", "p1_sets_lost"]] = p1_block
+
+    # P2's stats are P1's from the other side of the net
+    new_df["p2_games_won"] = new_df["p1_games_lost"]
+    new_df["p2_games_lost"] = new_df["p1_games_won"]
+    new_df["p2_sets_won"] = new_df["p1_sets_lost"]
+    new_df["p2_sets_lost"] = new_df["p1_sets_won"]
+
+    # Downcast to the smallest dtypes that fit, to cut memory traffic in
+    # feature engineering. Games stay int16: marathon matches exceed 127.
+    new_df = new_df.astype({
+        "p1_rank": np.int16, "p2_rank": np.int16,
+        "p1_age": np.float32, "p2_age": np.float32,
+        "p1_games_won": np.int16, "p1_games_lost": np.int16,
+        "p2_games_won": np.int16, "p2_games_lost": np.int16,
+        "p1_sets_won": np.int8, "p1_sets_lost": np.int8,
+        "p2_sets_won": np.int8, "p2_sets_lost": np.int8,
+    })
+
+    return encode_ids(new_df)
+
+def encode_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add integer codes used by feature engineering in place of strings:
+    - p1_id / p2_id share one code space, ordered by player name
+    - surface (as a Categorical over config.SURFACES) and its surface_id codes
+    """
+    p1_ids, p2_ids = encode_players(df)
+
+    known = df["surface"].isin(config.SURFACES)
+    surfaces = pd.Categorical(df["surface"].where(known, "Unknown"), categories=config.SURFACES)
+
+    return df.assign(
+        p1_id=p1_ids,
+        p2_id=p2_ids,
+        surface=surfaces,
+        surface_id=surfaces.codes.astype(np.int8),
+    )
+
+def encode_players(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Encode p1_name / p2_name into one shared int code space, ordered by name.
+    Returns: (p1_ids, p2_ids)
+    """
+    n = len(df)
+    names = pd.Categorical(pd.concat([df["p1_name"], df["p2_name"]], ignore_index=True))
+    codes = names.codes.astype(np.int32)
+    return codes[:n], codes[n:]
+
+def parse_match_scores(scores: pd.Series) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized version of parse_match_score over a whole score column.
+    All scores are scanned as one newline-joined byte buffer (ASCII digits).
+    Returns: (winner_games, loser_games, winner_sets, loser_sets) arrays
+    """
+    encoded = [s.encode() for s in scores.fillna("").astype(str).tolist()]
+    n = len(encoded)
+
+    # Byte offset where each score starts in the joined buffer
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+    score_starts = np.cumsum(lengths + 1) - (lengths + 1)
+    buf = np.frombuffer(b"\n".join(encoded), dtype=np.uint8)
+
+    set_pos, w_g, l_g = _parse_set_tokens(buf)
+    match_pos = np.searchsorted(score_starts, set_pos, side="right") - 1
 
-    return new_df
+    w_games = np.bincount(match_pos, weights=w_g, minlength=n).astype(np.int64)
+    l_games = np.bincount(match_pos, weights=l_g, minlength=n).astype(np.int64)
+    w_sets = np.bincount(match_pos, weights=w_g > l_g, minlength=n).astype(np.int64)
+    l_sets = np.bincount(match_pos, weights=l_g > w_g, minlength=n).astype(np.int64)
+
+    return w_games, l_games, w_sets, l_sets
+
+def _parse_set_tokens(buf: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find every valid "W-L" set token in a byte buffer.
+    Returns: (token byte offsets, winner_games, loser_games)
+    """
+    n_bytes = len(buf)
+    is_ws = np.isin(buf, SCORE_WHITESPACE)
+    is_digit = (buf >= ord("0")) & (buf <= ord("9"))
+    is_dash = buf == ord("-")
+    is_paren = buf == ord("(")
+
+    # Tokens are runs of non-whitespace bytes
+    in_token = ~is_ws
+    is_start = in_token.copy()
+    is_start[1:] &= is_ws[:-1]
+    starts = np.flatnonzero(is_start)
+    n_tokens = len(starts)
+    if n_tokens == 0:
+        return starts, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    token = np.maximum(np.cumsum(is_start) - 1, 0)
+    offset = np.arange(n_bytes) - starts[token]
+
+    # Only the part before the first "(" counts (drops tiebreak scores)
+    parens = np.cumsum(is_paren)
+    parens_before = parens[starts] - is_paren[starts]
+    head = in_token & (parens == parens_before[token])
+
+    def per_token(mask: np.ndarray, weights: np.ndarray | None = None) -> np.ndarray:
+        w = None if weights is None else weights[mask]
+        return np.bincount(token[mask], weights=w, minlength=n_tokens)
+
+    # A valid head is digits, one dash, digits
+    head_len = per_token(head)
+    n_dash = per_token(head & is_dash)
+    n_other = per_token(head & ~is_digit & ~is_dash)
+    dash_at = per_token(head & is_dash, offset).astype(np.int64)
+    valid = (n_dash == 1) & (n_other == 0) & (dash_at > 0) & (dash_at < head_len - 1)
+
+    # Retirement/walkover markers anywhere in a token void it
+    for marker in SCORE_SKIP_MARKERS:
+        n_hits = n_bytes - len(marker) + 1
+        if n_hits <= 0:
+            continue
+        hit = np.ones(n_hits, dtype=bool)
+        for k, byte in enumerate(marker):
+            hit &= buf[k:k + n_hits] == byte
+        valid[token[np.flatnonzero(hit)]] = False
+
+    # Each digit is scaled by its distance to the end of its number
+    digits = np.flatnonzero(head & is_digit & valid[token])
+    digit_token = token[digits]
+    is_left = offset[digits] < dash_at[digit_token]
+    number_end = np.where(is_left, dash_at[digit_token], head_len[digit_token])
+    value = (buf[digits] - ord("0")) * 10.0 ** (number_end - offset[digits] - 1)
+
+    w_g = np.bincount(digit_token[is_left], weights=value[is_left], minlength=n_tokens)
+    l_g = np.bincount(digit_token[~is_left], weights=value[~is_left], minlength=n_tokens)
+
+    return starts[valid], np.rint(w_g[valid]).astype(np.int64), np.rint(l_g[valid]).astype(np.int64)
 
 def parse_match_score(score_str: str) -> tuple[int, int, int, int]:
     """
@@ -187,19 +305,20 @@ def parse_match_score(score_str: str) -> tuple[int, int, int, int]:
         parts = s.split("-")
         if len(parts) != 2:
             continue
-            
-        try:
-            w_g = int(parts[0])
-            l_g = int(parts[1])
-            
-            w_games += w_g
-            l_games += l_g
-            
-            if w_g > l_g:
-                w_sets += 1
-            elif l_g > w_g:
-                l_sets += 1
-        except ValueError:
-            pass
+
+        # Check digits up front instead of catching int() failures
+        if not (parts[0].isdecimal() and parts[1].isdecimal()):
+            continue
+
+        w_g = int(parts[0])
+        l_g = int(parts[1])
+        
+        w_games += w_g
+        l_games += l_g
+        
+        if w_g > l_g:
+            w_sets += 1
+        elif l_g > w_g:
+            l_sets += 1
             
     return w_games, l_games, w_sets, l_sets
\ No newline at end of file
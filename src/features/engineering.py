@@ -6,8 +6,11 @@ Generates time-aware features from match data, including:
 - Recent form (rolling) features
 """
 import config
+import data.preprocess as preprocess
+import numpy as np
 import pandas as pd
 import features.rolling as rolling
+import features.segments as segments
 
 def add_features(df: pd.DataFrame) -> tuple[pd.DataFrame, dict, dict]:
     """
@@ -20,89 +23,112 @@ def add_features(df: pd.DataFrame) -> tuple[pd.DataFrame, dict, dict]:
     """
     print("⚙️  Engineering features...")
 
-    df = df.copy()
-    df["tourney_date"] = pd.to_datetime(df["tourney_date"], format="%Y%m%d", errors="coerce")
-    df = df.sort_values("tourney_date").reset_index(drop=True)
+    # tourney_date stays a YYYYMMDD int: it already sorts chronologically.
+    # Stable sort keeps same-day matches in their original order.
+    df = df.sort_values("tourney_date", kind="stable").reset_index(drop=True)
+
+    n_matches = len(df)
+
+    # Player/surface int codes from preprocessing. Player ids are ordered
+    # by name, so the lower id of a pair is also the first name of the
+    # sorted H2H key.
+    if "p1_id" not in df:
+        df = preprocess.encode_ids(df)
+
+    p1_idx = df["p1_id"].to_numpy()
+    p2_idx = df["p2_id"].to_numpy()
+
+    surf_idx = df["surface_id"].to_numpy()
+    n_surfaces = len(config.SURFACES)
+
+    p1_won = (df["target"] == 1).to_numpy()
+
+    # ----------------------------------------------------
+    # Surface features
+    # ----------------------------------------------------
+    # One (player, surface) slot per player appearance, interleaved
+    # p1/p2 so rows stay in chronological match order.
+    slots = np.stack([p1_idx * n_surfaces + surf_idx, p2_idx * n_surfaces + surf_idx], axis=1).ravel()
+    slot_wins = np.stack([p1_won, ~p1_won], axis=1).ravel()
+    slot_counts = np.column_stack([slot_wins, np.ones_like(slot_wins)]).astype(np.int64)
+
+    prior_counts, slot_first, slot_totals = _running_group_sums(slots, slot_counts)
+    prior_wins = prior_counts[:, 0].reshape(n_matches, 2)
+    prior_total = prior_counts[:, 1].reshape(n_matches, 2)
+
+    surface_pct = np.full((n_matches, 2), config.DEFAULT_WIN_PCT)
+    np.divide(prior_wins, prior_total, out=surface_pct, where=prior_total > 0)
+    surface_pct[surf_idx == config.SURFACES.index("Unknown")] = config.DEFAULT_WIN_PCT
+
+    # ----------------------------------------------------
+    # H2H feature
+    # ----------------------------------------------------
+    # Running (first player wins - second player wins) per pair,
+    # flipped to P1's perspective.
+    # Canonical pair key: (lower id << 32) | higher id, one int64 per pair
+    lo_idx = np.minimum(p1_idx, p2_idx).astype(np.int64)
+    hi_idx = np.maximum(p1_idx, p2_idx).astype(np.int64)
+    pair_keys = (lo_idx << 32) | hi_idx
+    p1_is_lo = p1_idx == lo_idx
+    lo_won = p1_won == p1_is_lo
+    pair_counts = np.column_stack([np.where(lo_won, 1, -1), lo_won]).astype(np.int64)
+
+    prior_pair, pair_first, pair_totals = _running_group_sums(pair_keys, pair_counts)
+    lead = prior_pair[:, 0]
+    h2h_diff = np.where(p1_is_lo, lead, -lead)
 
     # History containers
     # surface_history: { 'Player': { 'Hard': [Wins, Total] } }
     # h2h_history:     { tuple('P1', 'P2'): [P1_wins, P2_wins] }
-    surface_history = {} 
-    h2h_history = {}     
-
-    p1_surface_pct = []
-    p2_surface_pct = []
-    h2h_diff = []
-
-    def get_surface_win_pct(player: str, surface: str) -> float:
-        """Calculate historical win % for a player on a surface."""
-        if surface == "Unknown":
-            return config.DEFAULT_WIN_PCT
-
-        if player in surface_history and surface in surface_history[player]:
-            wins, total = surface_history[player][surface]
-            if total > 0:
-                return wins / total
-            
-        return config.DEFAULT_WIN_PCT
-
-    def update_surface_history(player: str, surface: str, won: bool) -> None:
-        """Update historical record for a player on a surface."""
-        if player not in surface_history:
-            surface_history[player] = {}
-        if surface not in surface_history[player]:
-            surface_history[player][surface] = [0, 0]
-            
-        surface_history[player][surface][1] += 1
-        if won:
-            surface_history[player][surface][0] += 1
-
-    for _, row in df.iterrows():
-        p1 = row["p1_name"]
-        p2 = row["p2_name"]
-        surface = row["surface"] if pd.notna(row["surface"]) else "Unknown"
-        p1_won = row["target"] == 1
-
-        # Surface features
-        p1_surface_pct.append(get_surface_win_pct(p1, surface))
-        p2_surface_pct.append(get_surface_win_pct(p2, surface))
-
-        # H2H feature
-        pair = tuple(sorted([p1, p2]))
-
-        if pair in h2h_history:
-            wins_a, wins_b = h2h_history[pair]
-
-            if p1 == pair[0]:
-                diff = wins_a - wins_b
-            else:
-                diff = wins_b - wins_a
-        else:
-            diff = 0
-
-        h2h_diff.append(diff)
-
-        # Update player surface histories
-        update_surface_history(p1, surface, p1_won)
-        update_surface_history(p2, surface, not p1_won)
-
-        if pair not in h2h_history:
-            h2h_history[pair] = [0, 0]
-
-        # Compute winner index
-        if (p1_won and p1 == pair[0]) or (not p1_won and p1 != pair[0]):
-            winner_index = 0
-        else:
-            winner_index = 1
-
-        h2h_history[pair][winner_index] += 1
+    # Names are read back from each key's first row (slots interleave p1/p2)
+    p1_names = df["p1_name"].to_numpy()
+    p2_names = df["p2_name"].to_numpy()
+
+    surface_history = {}
+    for i in np.argsort(slot_first):
+        m, side = divmod(slot_first[i], 2)
+        player = p2_names[m] if side else p1_names[m]
+        surface = config.SURFACES[surf_idx[m]]
+        surface_history.setdefault(player, {})[surface] = [int(slot_totals[i, 0]), int(slot_totals[i, 1])]
+
+    h2h_history = {}
+    for i in np.argsort(pair_first):
+        m = pair_first[i]
+        lead_total, lo_wins = pair_totals[i]
+        pair = (p1_names[m], p2_names[m]) if p1_is_lo[m] else (p2_names[m], p1_names[m])
+        h2h_history[pair] = [int(lo_wins), int(lo_wins - lead_total)]
 
     # Attach features
-    df["p1_surface_win_pct"] = p1_surface_pct
-    df["p2_surface_win_pct"] = p2_surface_pct
+    df["p1_surface_win_pct"] = surface_pct[:, 0]
+    df["p2_surface_win_pct"] = surface_pct[:, 1]
     df["h2h_diff"] = h2h_diff
 
     # Add rolling features
     df = rolling.compute_rolling_features(df)
 
     return df, surface_history, h2h_history
+
+def _running_group_sums(keys: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Accumulate the columns of `values` per key, with rows in chronological order.
+
+    Returns:
+        - per row, the sums over all earlier rows sharing its key
+        - per key, the row index of its first appearance
+        - per key, the sums over all of its rows
+    """
+    n_rows = len(keys)
+
+    # Stable sort keeps chronological order within each key's run
+    order = np.argsort(keys, kind="stable")
+    sorted_vals = values[order]
+    starts = segments.run_starts(keys[order])
+    lengths = segments.run_lengths(starts, n_rows)
+
+    # Exclusive running total, rebased at the start of each run
+    running = np.cumsum(sorted_vals, axis=0) - sorted_vals
+    prior = np.empty_like(running)
+    prior[order] = running - np.repeat(running[starts], lengths, axis=0)
+
+    totals = np.add.reduceat(sorted_vals, starts, axis=0)
+    return prior, order[starts], totals
@@ -3,8 +3,11 @@ Rolling window feature computation.
 Calculates recent form statistics (win rate, games/sets won/lost)
 over a sliding window of past matches.
 """
+import numpy as np
 import pandas as pd
 import config
+import data.preprocess as preprocess
+import features.segments as segments
 
 def compute_rolling_features(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -20,104 +23,98 @@ def compute_rolling_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     print("   ⏳ Computing rolling features...")
     
-    # 1. Create a player-centric DataFrame
-    # We need one row per player per match to sort and shift correctly
-    
-    # Player 1 perspective
-    p1_cols = {
-        'tourney_date': 'date',
-        'p1_name': 'player',
-        'p2_name': 'opponent',
-        'target': 'won', # 1 if p1 won
-        'p1_games_won': 'games_won',
-        'p1_games_lost': 'games_lost',
-        'p1_sets_won': 'sets_won',
-        'p1_sets_lost': 'sets_lost'
-    }
-    
-    df_p1 = df[list(p1_cols.keys())].rename(columns=p1_cols)
-    df_p1['match_index'] = df.index
-    df_p1['is_p1'] = True
-    
-    # Player 2 perspective
-    p2_cols = {
-        'tourney_date': 'date',
-        'p2_name': 'player',
-        'p1_name': 'opponent',
-        # if target=1 (p1 won), then p2 lost (0). if target=0 (p1 lost), then p2 won (1)
-        'won_inverse': 'won', 
-        'p2_games_won': 'games_won',
-        'p2_games_lost': 'games_lost',
-        'p2_sets_won': 'sets_won',
-        'p2_sets_lost': 'sets_lost'
-    }
-    
-    df_p2 = df.copy()
-    df_p2['match_index'] = df.index
-    df_p2['won_inverse'] = 1 - df_p2['target']
-    df_p2 = df_p2[list(p2_cols.keys()) + ['match_index']] # need match_index from original
-    df_p2 = df_p2.rename(columns=p2_cols)
-    df_p2['is_p1'] = False
-    
-    # Concatenate to get full history
-    player_df = pd.concat([df_p1, df_p2], ignore_index=True)
-    
+    # 1. Build player-centric arrays
+    # One row per player per match (p1 rows, then p2 rows), stored as
+    # flat NumPy columns rather than a long-format DataFrame.
+    n_matches = len(df)
+
+    if 'p1_id' in df:
+        p1_ids, p2_ids = df['p1_id'].to_numpy(), df['p2_id'].to_numpy()
+    else:
+        p1_ids, p2_ids = preprocess.encode_players(df)
+
+    player_codes = np.concatenate([p1_ids, p2_ids])
+    dates = np.concatenate([df['tourney_date'].to_numpy()] * 2)
+    match_index = np.tile(np.arange(n_matches), 2)
+
+    # if target=1 (p1 won), then p2 lost (0). if target=0 (p1 lost), then p2 won (1)
+    won = df['target'].to_numpy()
+    metrics = ['won', 'games_won', 'games_lost', 'sets_won', 'sets_lost']
+    stats = np.column_stack([
+        np.concatenate([won, 1 - won]),
+        np.concatenate([df['p1_games_won'], df['p2_games_won']]),
+        np.concatenate([df['p1_games_lost'], df['p2_games_lost']]),
+        np.concatenate([df['p1_sets_won'], df['p2_sets_won']]),
+        np.concatenate([df['p1_sets_lost'], df['p2_sets_lost']]),
+    ]).astype(np.int32)
+
     # Sort by player and date to ensure correct rolling window
-    player_df = player_df.sort_values(['player', 'date', 'match_index'])
-    
+    order = np.lexsort((match_index, dates, player_codes))
+    player_ids = player_codes[order]
+    stats = stats[order]
+
     # 2. Compute Rolling Stats
     windows = config.RECENT_FORM_WINDOWS
-    metrics = ['won', 'games_won', 'games_lost', 'sets_won', 'sets_lost']
-    
-    # Group by player
-    grouped = player_df.groupby('player')[metrics]
-    
-    for window in windows:
-        # We shift(1) to ensure we only use PAST matches, not the current one.
-        # Then rolling(window, min_periods=1).mean()
-        
-        # Calculate rolling means
-        rolling_stats = grouped.apply(
-            lambda x: x.shift(1).rolling(window=window, min_periods=1).mean()
-        )
-        
-        # Rename columns
-        # e.g. won -> recent_win_rate_5
-        # games_won -> recent_games_won_avg_5
-        
-        player_df[f'recent_win_rate_{window}'] = rolling_stats['won'].reset_index(0, drop=True)
-        player_df[f'recent_games_won_avg_{window}'] = rolling_stats['games_won'].reset_index(0, drop=True)
-        player_df[f'recent_games_lost_avg_{window}'] = rolling_stats['games_lost'].reset_index(0, drop=True)
-        player_df[f'recent_sets_won_avg_{window}'] = rolling_stats['sets_won'].reset_index(0, drop=True)
-        player_df[f'recent_sets_lost_avg_{window}'] = rolling_stats['sets_lost'].reset_index(0, drop=True)
+
+    # Output names per metric
+    # e.g. won -> recent_win_rate_5
+    # games_won -> recent_games_won_avg_5
+    metric_names = {
+        'won': 'recent_win_rate_{}',
+        'games_won': 'recent_games_won_avg_{}',
+        'games_lost': 'recent_games_lost_avg_{}',
+        'sets_won': 'recent_sets_won_avg_{}',
+        'sets_lost': 'recent_sets_lost_avg_{}',
+    }
+    feature_names = [metric_names[m].format(window) for window in windows for m in metrics]
+
+    # Scatter back from player order to (p1 rows, p2 rows) order
+    rolling_stats = np.empty((2 * n_matches, len(feature_names)))
+    rolling_stats[order] = np.hstack(_shifted_rolling_means(player_ids, stats, windows))
 
     # Fill NaNs for players with insufficient history
     # Win rate defaults to 0.5 (neutral)
-    win_cols = [c for c in player_df.columns if 'win_rate' in c]
-    player_df[win_cols] = player_df[win_cols].fillna(config.DEFAULT_WIN_PCT)
-    
     # Other stats default to the global mean (neutral performance)
-    stat_cols = [c for c in player_df.columns if 'recent_' in c and 'win_rate' not in c]
-    for col in stat_cols:
-         player_df[col] = player_df[col].fillna(player_df[col].mean())
-    
+    is_win_rate = np.array(['win_rate' in name for name in feature_names])
+    fill_values = np.where(is_win_rate, config.DEFAULT_WIN_PCT, np.nanmean(rolling_stats, axis=0))
+    rolling_stats = np.where(np.isnan(rolling_stats), fill_values, rolling_stats)
 
+    # 3. Attach p1 / p2 features to the original DataFrame
+    p1_stats = rolling_stats[:n_matches]
+    p2_stats = rolling_stats[n_matches:]
 
-    # 3. Merge back to original DataFrame
-    # We need to pull the features back for p1 and p2 separately
-    
-    # Extract p1 features
-    p1_features = player_df[player_df['is_p1']].set_index('match_index')
-    p1_cols_map = {c: f'p1_{c}' for c in player_df.columns if 'recent_' in c}
-    p1_features = p1_features.rename(columns=p1_cols_map)
-    
-    # Extract p2 features
-    p2_features = player_df[~player_df['is_p1']].set_index('match_index')
-    p2_cols_map = {c: f'p2_{c}' for c in player_df.columns if 'recent_' in c}
-    p2_features = p2_features.rename(columns=p2_cols_map)
-    
-    # Join
-    df = df.join(p1_features[list(p1_cols_map.values())])
-    df = df.join(p2_features[list(p2_cols_map.values())])
-    
-    return df
+    new_columns = {f'p1_{name}': p1_stats[:, j] for j, name in enumerate(feature_names)}
+    new_columns.update({f'p2_{name}': p2_stats[:, j] for j, name in enumerate(feature_names)})
+
+    return df.assign(**new_columns)
+
+def _shifted_rolling_means(player_ids: np.ndarray, stats: np.ndarray, windows: list[int]) -> list[np.ndarray]:
+    """
+    For each window, the mean of each row's previous `window` rows for the
+    same player, excluding the current row (NaN if the player has no prior rows).
+    Rows must be sorted by player, then date.
+
+    All players are handled in one vectorized pass: a row only reads its own
+    player's prefix sums, so there is no per-player loop or shared state.
+    """
+    n_rows = len(player_ids)
+    rows = np.arange(n_rows)
+
+    # Number of earlier rows each player has at every position
+    n_prior = segments.run_positions(player_ids)
+
+    # prefix[i] = sum of stats[:i], so any run of rows sums in O(1).
+    # Integer sums are exact; only the final division is floating point.
+    prefix = np.zeros((n_rows + 1, stats.shape[1]), dtype=np.int64)
+    np.cumsum(stats, axis=0, out=prefix[1:])
+
+    results = []
+    for window in windows:
+        n_used = np.minimum(n_prior, window)
+        totals = prefix[rows] - prefix[rows - n_used]
+
+        means = np.full(stats.shape, np.nan)
+        np.divide(totals, n_used[:, None], out=means, where=n_used[:, None] > 0)
+        results.append(means)
+
+    return results
@@ -0,0 +1,27 @@
+"""
+Run-length helpers for arrays sorted by a group key.
+Used in place of groupby when each group's rows are already contiguous.
+"""
+import numpy as np
+
+def run_starts(sorted_keys: np.ndarray) -> np.ndarray:
+    """
+    Start position of each run of equal keys in a sorted array.
+    """
+    if len(sorted_keys) == 0:
+        return np.zeros(0, dtype=np.intp)
+    return np.r_[0, np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1]
+
+def run_lengths(starts: np.ndarray, n_rows: int) -> np.ndarray:
+    """
+    Length of each run, given its start positions.
+    """
+    return np.diff(np.r_[starts, n_rows])
+
+def run_positions(sorted_keys: np.ndarray) -> np.ndarray:
+    """
+    Position of each row within its run (0 for the first row of a key).
+    """
+    n_rows = len(sorted_keys)
+    starts = run_starts(sorted_keys)
+    return np.arange(n_rows) - np.repeat(starts, run_lengths(starts, n_rows))
@@ -24,8 +24,10 @@ def train_and_evaluate(df: pd.DataFrame) -> Any:
     print("🧠 Training models...")
     
     # Split by Year (Train: <END_YEAR, Test: END_YEAR)
-    train_mask = df['tourney_date'].dt.year < config.END_YEAR
-    test_mask = df['tourney_date'].dt.year == config.END_YEAR
+    # tourney_date is a YYYYMMDD int
+    match_year = df['tourney_date'] // 10000
+    train_mask = match_year < config.END_YEAR
+    test_mask = match_year == config.END_YEAR
     
     X_train = df.loc[train_mask, config.MODEL_FEATURES]
     y_train = df.loc[train_mask, 'target']
@@ -13,22 +13,34 @@ def main() -> None:
     
     Steps:
     1. Load data (cached or download new).
-    2. Preprocess and feature engineer.
+    2. Preprocess and feature engineer (or load features cached for this data).
     3. Train model (or load existing).
     4. Generate visualizations.
     5. Start interactive prediction loop.
     """
-    # 1. Load Data
-    data = loader.load_cached_data(config.DATA_PATH, config.START_YEAR, config.END_YEAR)
+    # Reuse features engineered by a previous run on the same data, if any
+    cached = None
+    if config.DATA_PATH.exists():
+        cache_paths = loader.feature_cache_paths(config.DATA_PATH, config.START_YEAR, config.END_YEAR)
+        cached = loader.load_cached_features(*cache_paths)
 
-    if data is None:
-        data = loader.load_atp_data(config.START_YEAR, config.END_YEAR)
-        data.to_csv(config.DATA_PATH, index=False)
-        print(f"💾 New data saved to {config.DATA_PATH}")
+    if cached is not None:
+        final_df, surf_history, h2h_history = cached
+    else:
+        # 1. Load Data
+        data = loader.load_cached_data(config.DATA_PATH, config.START_YEAR, config.END_YEAR)
+
+        if data is None:
+            data = loader.load_atp_data(config.START_YEAR, config.END_YEAR)
+            data.to_csv(config.DATA_PATH, index=False)
+            print(f"💾 New data saved to {config.DATA_PATH}")
+
+        # 2. Preprocess & Feature Engineering
+        processed_data = preprocess.preprocess_data(data)
+        final_df, surf_history, h2h_history = features.add_features(processed_data)
 
-    # 2. Preprocess & Feature Engineering
-    processed_data = preprocess.preprocess_data(data)
-    final_df, surf_history, h2h_history = features.add_features(processed_data)
+        cache_paths = loader.feature_cache_paths(config.DATA_PATH, config.START_YEAR, config.END_YEAR)
+        loader.save_cached_features(*cache_paths, final_df, surf_history, h2h_history)
     
     # 3. Model Training / Loading
     if config.MODEL_PATH.exists():
@@ -0,0 +1,77 @@
+import unittest
+import pandas as pd
+import sys
+import os
+
+# Add src directory to Python path so we can import project modules.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import features.engineering as engineering
+import config
+
+class TestHistoryFeatures(unittest.TestCase):
+    def setUp(self):
+        """
+        Create four matches between Player A and Player B,
+        plus one match for Player A against Player C.
+        """
+
+        # Match outcomes:
+        # M1 (Hard):  A beats B
+        # M2 (Hard):  B beats A  (B listed as P1)
+        # M3 (Clay):  A beats C
+        # M4 (Hard):  A beats B  (B listed as P1)
+        # M5 (Grass): B vs A, surface history empty for both
+
+        data = {
+            'tourney_date': [20230101, 20230102, 20230103, 20230104, 20230105],
+            'surface': ['Hard', 'Hard', 'Clay', 'Hard', 'Grass'],
+            'p1_name': ['A', 'B', 'A', 'B', 'B'],
+            'p2_name': ['B', 'A', 'C', 'A', 'A'],
+            'target':  [1, 1, 1, 0, 1],
+        }
+        stats = ['games_won', 'games_lost', 'sets_won', 'sets_lost']
+        for side in ('p1', 'p2'):
+            for stat in stats:
+                data[f'{side}_{stat}'] = [0] * 5
+
+        self.df = pd.DataFrame(data)
+
+    def test_surface_win_pct(self):
+        """
+        Surface win % must only use prior matches on the same surface.
+        """
+        res, surface_history, _ = engineering.add_features(self.df)
+
+        # M1: no history
+        self.assertEqual(res.loc[0, 'p1_surface_win_pct'], config.DEFAULT_WIN_PCT)
+
+        # M4 (Hard): B is 1-1 on hard, A is 1-1 on hard
+        self.assertAlmostEqual(res.loc[3, 'p1_surface_win_pct'], 0.5)
+        self.assertAlmostEqual(res.loc[3, 'p2_surface_win_pct'], 0.5)
+
+        # M5 (Grass): no grass history -> default
+        self.assertEqual(res.loc[4, 'p2_surface_win_pct'], config.DEFAULT_WIN_PCT)
+
+        self.assertEqual(surface_history['A'], {'Hard': [2, 3], 'Clay': [1, 1], 'Grass': [0, 1]})
+
+    def test_h2h(self):
+        """
+        H2H diff is taken from P1's perspective, using prior meetings only.
+        """
+        res, _, h2h_history = engineering.add_features(self.df)
+
+        # M1: first meeting
+        self.assertEqual(res.loc[0, 'h2h_diff'], 0)
+
+        # M2: A leads 1-0, B is P1
+        self.assertEqual(res.loc[1, 'h2h_diff'], -1)
+
+        # M5: A leads 2-1, B is P1
+        self.assertEqual(res.loc[4, 'h2h_diff'], -1)
+
+        self.assertEqual(h2h_history[('A', 'B')], [2, 2])
+        self.assertEqual(h2h_history[('A', 'C')], [1, 0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import pandas as pd
+import sys
+import os
+
+# Add src directory to Python path so we can import project modules.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import data.preprocess as preprocess
+
+class TestScoreParsing(unittest.TestCase):
+    def setUp(self):
+        """
+        Score strings as they appear in the Sackmann dataset,
+        including tiebreaks, retirements, walkovers and missing scores.
+        """
+        self.scores = pd.Series([
+            '6-4 3-6 7-6(5)',
+            '7-5 2-0 RET',
+            'W/O',
+            '',
+            None,
+            '6-4 6-7(10) [10-8]',
+            '6-3 4-6 6-4 6-7(4) 7-5',
+        ])
+
+    def test_vectorized_matches_scalar(self):
+        """
+        parse_match_scores must agree with parse_match_score row by row.
+        """
+        w_games, l_games, w_sets, l_sets = preprocess.parse_match_scores(self.scores)
+
+        for i, score in enumerate(self.scores):
+            expected = preprocess.parse_match_score(score)
+            self.assertEqual((w_games[i], l_games[i], w_sets[i], l_sets[i]), expected)
+
+    def test_known_scores(self):
+        """
+        Spot-check a few parsed scores.
+        """
+        w_games, l_games, w_sets, l_sets = preprocess.parse_match_scores(self.scores)
+
+        # 6-4 3-6 7-6(5): 16-16 games, 2-1 sets
+        self.assertEqual((w_games[0], l_games[0], w_sets[0], l_sets[0]), (16, 16, 2, 1))
+
+        # Match tiebreak in brackets is not a set
+        self.assertEqual((w_games[5], l_games[5], w_sets[5], l_sets[5]), (12, 11, 1, 1))
+
+        # Walkover / missing score -> all zeros
+        self.assertEqual((w_games[2], l_games[2], w_sets[2], l_sets[2]), (0, 0, 0, 0))
+        self.assertEqual((w_games[4], l_games[4], w_sets[4], l_sets[4]), (0, 0, 0, 0))
+
+if __name__ == '__main__':
+    unittest.main()